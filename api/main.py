@@ -1,19 +1,29 @@
 from typing import List
-from fastapi import FastAPI, HTTPException, Request
-from pydantic import BaseModel, Field
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+import itertools
 import uuid
+import os
 import time
 import logging
-import json
+import msgspec
+import numpy as np
+import orjson
 
 from api.services.preprocessing import (
     preprocess_request,
-    preprocess_request_batch
+    preprocess_request_array,
+    preprocess_request_columns
 )
 from api.services.inference import (
+    MODEL_NAME,
+    MODEL_VERSION,
     run_inference,
-    run_inference_batch
+    run_inference_columns,
+    run_in_inference_pool
 )
+from api.services.batching import micro_batcher
 from api.services.metrics import metrics_store
 
 
@@ -25,7 +35,7 @@ class JsonFormatter(logging.Formatter):
             "level": record.levelname,
             "message": record.getMessage(),
         }
-        return json.dumps(log_record)
+        return orjson.dumps(log_record).decode()
 
 
 handler = logging.StreamHandler()
@@ -45,27 +55,62 @@ app = FastAPI(
 )
 
 
+# Lifecycle: micro-batching worker for /predict
+@app.on_event("startup")
+async def start_micro_batcher():
+    micro_batcher.start()
+
+
+@app.on_event("shutdown")
+async def stop_micro_batcher():
+    await micro_batcher.stop()
+
+
+# Lifecycle: optional SHAP preload (ENABLE_SHAP=1)
+@app.on_event("startup")
+async def warmup_explainer():
+    if os.getenv("ENABLE_SHAP", "").lower() not in {"1", "true", "yes"}:
+        return
+
+    try:
+        from api.services.explainability import warmup
+
+        await run_in_inference_pool(warmup)
+        logger.info("explainer_warmup=done")
+
+    except Exception:
+        logger.exception("explainer_warmup=failed")
+
+
+# Request ids: per-process prefix + counter. The random part keeps ids
+# unique across restarts and replicas (containers often all run as pid 1).
+_REQUEST_ID_PREFIX = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+_REQUEST_COUNTER = itertools.count()
+
+
 # Middleware: request id + latency
 @app.middleware("http")
 async def add_request_id_and_logging(request: Request, call_next):
-    request_id = str(uuid.uuid4())
-    start_time = time.time()
+    request_id = f"{_REQUEST_ID_PREFIX}-{next(_REQUEST_COUNTER):x}"
+    start_time = time.perf_counter()
 
     request.state.request_id = request_id
 
     response = await call_next(request)
 
-    duration_ms = round((time.time() - start_time) * 1000, 2)
+    duration_ms = (time.perf_counter() - start_time) * 1000
 
     response.headers["X-Request-ID"] = request_id
     metrics_store.record_request(duration_ms)
 
+    # %-style args: formatting is skipped when INFO is filtered out
     logger.info(
-        f"request_id={request_id} "
-        f"method={request.method} "
-        f"path={request.url.path} "
-        f"status_code={response.status_code} "
-        f"duration_ms={duration_ms}"
+        "request_id=%s method=%s path=%s status_code=%s duration_ms=%.2f",
+        request_id,
+        request.method,
+        request.url.path,
+        response.status_code,
+        duration_ms
     )
 
     return response
@@ -89,6 +134,50 @@ class CreditApplicationRequest(BaseModel):
                                             "example": 8})
 
 
+# Batch ingress record: same fields as CreditApplicationRequest, decoded by
+# msgspec without building a Pydantic model per row
+class CreditApplicationRecord(msgspec.Struct):
+    person_age: int
+    person_income: float
+    person_home_ownership: str
+    person_emp_length: int
+    loan_intent: str
+    loan_grade: str
+    loan_amnt: float
+    loan_int_rate: float
+    loan_percent_income: float
+    cb_person_default_on_file: str
+    cb_person_cred_hist_length: int
+
+
+_FIELDS = CreditApplicationRecord.__struct_fields__
+
+# strict=False: coerce numeric strings like Pydantic's lax mode
+_BATCH_DECODER = msgspec.json.Decoder(
+    List[CreditApplicationRecord], strict=False
+)
+
+# Slow path for bodies msgspec rejects: Pydantic decides (e.g. it accepts
+# bools for ints) and reports errors in FastAPI's usual 422 shape
+_BATCH_ADAPTER = TypeAdapter(List[CreditApplicationRequest])
+
+_BATCH_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {
+                    "type": "array",
+                    "items": {
+                        "$ref": "#/components/schemas/CreditApplicationRequest"
+                    },
+                }
+            }
+        },
+    }
+}
+
+
 # Health
 @app.get("/health", tags=["System"])
 def health_check():
@@ -100,8 +189,8 @@ def health_check():
 def version():
     return {
         "service": "credit-risk-api",
-        "model_name": "credit_risk_gradient_boosting",
-        "model_version": "v1.0.0"
+        "model_name": MODEL_NAME,
+        "model_version": MODEL_VERSION
     }
 
 
@@ -113,23 +202,25 @@ def get_metrics():
 
 # Single prediction
 @app.post("/predict", tags=["Prediction"])
-def predict_credit_risk(payload: CreditApplicationRequest, request: Request):
+async def predict_credit_risk(payload: CreditApplicationRequest, request: Request):
     try:
         request_id = request.state.request_id
 
-        features = preprocess_request(payload.model_dump())
+        # Generated single-record path costs a few µs; a pool hop costs more
+        row = preprocess_request_array(payload.model_dump())
 
-        result = run_inference(
-            features=features,
+        result = await micro_batcher.submit(
+            row=row,
             request_id=request_id
         )
 
         metrics_store.record_single()
 
         logger.info(
-            f"request_id={request_id} "
-            f"prob={result['probability_of_default']} "
-            f"decision={result['decision']}"
+            "request_id=%s prob=%s decision=%s",
+            request_id,
+            result["probability_of_default"],
+            result["decision"]
         )
 
         return result
@@ -139,14 +230,30 @@ def predict_credit_risk(payload: CreditApplicationRequest, request: Request):
 
     except Exception:
         logger.exception(
-            f"request_id={request.state.request_id} error=prediction_failed"
+            "request_id=%s error=prediction_failed", request.state.request_id
         )
         raise HTTPException(500, "Internal prediction error")
 
 
 # Batch prediction
-@app.post("/predict/batch", tags=["Prediction"])
-def predict_credit_risk_batch(payloads: List[CreditApplicationRequest], request: Request):
+@app.post(
+    "/predict/batch",
+    tags=["Prediction"],
+    openapi_extra=_BATCH_REQUEST_BODY
+)
+async def predict_credit_risk_batch(request: Request):
+    body = await request.body()
+    try:
+        payloads = _BATCH_DECODER.decode(body)
+    except msgspec.DecodeError:
+        try:
+            payloads = _BATCH_ADAPTER.validate_json(body)
+        except ValidationError as e:
+            raise RequestValidationError([
+                {**error, "loc": ("body", *error["loc"])}
+                for error in e.errors(include_url=False)
+            ])
+
     batch_size = len(payloads)
 
     if batch_size == 0:
@@ -159,49 +266,80 @@ def predict_credit_risk_batch(payloads: List[CreditApplicationRequest], request:
     try:
         request_id = request.state.request_id
 
-        raw_records = [p.model_dump() for p in payloads]
-        features = preprocess_request_batch(raw_records)
+        # Columnar build straight from struct attributes
+        raw_columns = {f: [getattr(p, f) for p in payloads] for f in _FIELDS}
+        features = await run_in_inference_pool(
+            preprocess_request_columns, raw_columns
+        )
 
-        results = run_inference_batch(
+        results, decision_counts = await run_in_inference_pool(
+            run_inference_columns,
             features=features,
             request_id=request_id
         )
 
         metrics_store.record_batch(batch_size)
 
-        for r in results:
-            logger.info(
-                f"request_id={request_id} "
-                f"prob={r['probability_of_default']} "
-                f"decision={r['decision']}"
-            )
-
-        return {
-            "batch_size": batch_size,
-            "results": results
-        }
+        # One summary line per batch; skip the reductions when INFO is off
+        if logger.isEnabledFor(logging.INFO):
+            probs = results["probability_of_default"]
+            if isinstance(probs, np.ndarray):
+                logger.info(
+                    "request_id=%s batch_size=%s prob_mean=%.4f "
+                    "prob_min=%.4f prob_max=%.4f decisions=%s",
+                    request_id,
+                    batch_size,
+                    probs.mean(),
+                    probs.min(),
+                    probs.max(),
+                    decision_counts
+                )
+            else:
+                logger.info(
+                    "request_id=%s batch_size=%s prob=NA decisions=%s",
+                    request_id,
+                    batch_size,
+                    decision_counts
+                )
+
+        # Columnar results; numpy arrays are serialized natively by orjson
+        return Response(
+            content=orjson.dumps(
+                {
+                    "batch_size": batch_size,
+                    "model_name": MODEL_NAME,
+                    "model_version": MODEL_VERSION,
+                    "results": results
+                },
+                option=orjson.OPT_SERIALIZE_NUMPY
+            ),
+            media_type="application/json"
+        )
 
     except ValueError as ve:
         raise HTTPException(400, str(ve))
 
     except Exception:
         logger.exception(
-            f"request_id={request.state.request_id} error=batch_prediction_failed"
+            "request_id=%s error=batch_prediction_failed", request.state.request_id
         )
         raise HTTPException(500, "Internal batch prediction error")
 
 
 # Prediction + explainability
 @app.post("/predict/explain", tags=["Explainability"])
-def predict_with_explanation(payload: CreditApplicationRequest, request: Request):
+async def predict_with_explanation(payload: CreditApplicationRequest, request: Request):
     try:
         from api.services.explainability import explain_prediction
 
         request_id = request.state.request_id
 
-        features = preprocess_request(payload.model_dump())
+        features = await run_in_inference_pool(
+            preprocess_request, payload.model_dump()
+        )
 
-        result = run_inference(
+        result = await run_in_inference_pool(
+            run_inference,
             features=features,
             request_id=request_id
         )
@@ -209,13 +347,15 @@ def predict_with_explanation(payload: CreditApplicationRequest, request: Request
         metrics_store.record_single()
 
         logger.info(
-            f"request_id={request_id} "
-            f"prob={result['probability_of_default']} "
-            f"decision={result['decision']} "
-            f"explainability=True"
+            "request_id=%s prob=%s decision=%s explainability=True",
+            request_id,
+            result["probability_of_default"],
+            result["decision"]
         )
 
-        explanation = explain_prediction(features)
+        explanation = await run_in_inference_pool(
+            explain_prediction, features
+        )
 
         return {
             **result,
@@ -230,6 +370,6 @@ def predict_with_explanation(payload: CreditApplicationRequest, request: Request
 
     except Exception:
         logger.exception(
-            f"request_id={request.state.request_id} error=explainability_failed"
+            "request_id=%s error=explainability_failed", request.state.request_id
         )
         raise HTTPException(500, "Internal explainability error")
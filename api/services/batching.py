@@ -0,0 +1,196 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from api.services.inference import (
+    check_finite,
+    run_inference,
+    run_inference_batch,
+    run_in_inference_pool
+)
+from api.services.preprocessing import features_frame
+
+logger = logging.getLogger("credit-risk-api")
+
+# Coalescing limits; the latency window only applies while a flush is in flight
+MAX_BATCH_SIZE = 32
+MAX_LATENCY_MS = 5.0
+
+_Item = Tuple[np.ndarray, Optional[str], asyncio.Future]
+
+
+def _score_single(row: np.ndarray, request_id: Optional[str]) -> Dict:
+    return run_inference(features_frame(row), request_id)
+
+
+def _score_rows(rows: List[np.ndarray], request_id: str) -> List[Dict]:
+    # One contiguous block and one DataFrame per batch, not per request
+    return run_inference_batch(
+        features_frame(np.concatenate(rows, axis=0)), request_id
+    )
+
+
+def _fail(items: List[_Item], exc: BaseException) -> None:
+    for _, _, future in items:
+        if not future.done():
+            future.set_exception(exc)
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-record predictions into one batch inference call.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_latency_ms: float = MAX_LATENCY_MS
+    ) -> None:
+        self.max_batch_size = max_batch_size
+        self.max_latency_ms = max_latency_ms
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flushes: Set[asyncio.Task] = set()
+
+    def _is_running(self) -> bool:
+        if self._task is None or self._task.done():
+            return False
+        try:
+            return self._task.get_loop() is asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+
+    def start(self) -> None:
+        if self._is_running():
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._worker())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        # Let batches already handed to the pool resolve their requests
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+        # Fail anything still queued so callers don't hang
+        pending: List[_Item] = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        _fail(pending, RuntimeError("Micro-batcher stopped"))
+
+        self._task = None
+        self._queue = None
+
+    async def submit(
+        self,
+        row: np.ndarray,
+        request_id: Optional[str] = None
+    ) -> Dict:
+        """
+        Score one (1, NUM_FEATURES) feature row from preprocess_request_array.
+        """
+        # Reject bad rows here so they never fail a shared batch
+        check_finite(row)
+
+        # Worker not started (e.g. no startup event) -> score directly
+        if not self._is_running():
+            return await run_in_inference_pool(_score_single, row, request_id)
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, request_id, future))
+        return await future
+
+    def _drain(self, batch: List[_Item]) -> None:
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+    async def _collect(
+        self,
+        batch: List[_Item],
+        loop: asyncio.AbstractEventLoop
+    ) -> None:
+        batch.append(await self._queue.get())
+        self._drain(batch)
+
+        # Only hold the batch open while another flush is in flight;
+        # an idle server scores a lone request immediately.
+        if not self._flushes or len(batch) >= self.max_batch_size:
+            return
+
+        deadline = loop.time() + self.max_latency_ms / 1000
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(
+                    await asyncio.wait_for(self._queue.get(), timeout)
+                )
+            except asyncio.TimeoutError:
+                break
+            self._drain(batch)
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch: List[_Item] = []
+            try:
+                await self._collect(batch, loop)
+            except asyncio.CancelledError:
+                _fail(batch, RuntimeError("Micro-batcher stopped"))
+                raise
+
+            flush = loop.create_task(self._flush(batch))
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: List[_Item]) -> None:
+        request_ids = [request_id or "" for _, request_id, _ in batch]
+
+        try:
+            results = await run_in_inference_pool(
+                _score_rows,
+                [row for row, _, _ in batch],
+                ",".join(request_ids)
+            )
+        except Exception as exc:
+            if len(batch) == 1:
+                _fail(batch, exc)
+                return
+
+            # Isolate the failure: each request gets its own result or error
+            logger.warning(
+                "request_ids=%s error=micro_batch_failed retry=per_row",
+                ",".join(request_ids)
+            )
+            await asyncio.gather(*(self._flush_single(item) for item in batch))
+            return
+
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _flush_single(self, item: _Item) -> None:
+        row, request_id, future = item
+
+        try:
+            result = await run_in_inference_pool(_score_single, row, request_id)
+        except Exception as exc:
+            _fail([item], exc)
+            return
+
+        if not future.done():
+            future.set_result(result)
+
+
+micro_batcher = MicroBatcher()
@@ -1,13 +1,17 @@
+import numpy as np
 import pandas as pd
+from collections import OrderedDict
+from threading import Lock
 from typing import Dict, List
 import hashlib
-import json
 
 from api.services.inference import model  # use already-loaded model
 
 
-# In-memory cache (process-level)
-_SHAP_CACHE: Dict[str, Dict] = {}
+# In-memory LRU cache (process-level, bounded)
+_SHAP_CACHE_MAXSIZE = 10_000
+_SHAP_CACHE: "OrderedDict[str, Dict]" = OrderedDict()
+_SHAP_LOCK = Lock()
 
 # Lazy globals
 _explainer = None
@@ -24,16 +28,54 @@ def _get_explainer():
                 "SHAP is not installed. Explainability is only available in Docker."
             ) from e
 
-        _explainer = shap.TreeExplainer(model)
+        # No background data: path-dependent SHAP from the trees' own cover
+        _explainer = shap.TreeExplainer(
+            model, feature_perturbation="tree_path_dependent"
+        )
 
     return _explainer
 
 
+def warmup() -> None:
+    """
+    Build the explainer and run one explanation so the first request
+    does not pay for SHAP import and tree traversal setup.
+    """
+    explainer = _get_explainer()
+    explainer.shap_values(
+        np.zeros((1, model.n_features_in_), dtype=np.float64),
+        check_additivity=False
+    )
+
+
 def _hash_features(features: pd.DataFrame) -> str:
-    payload = features.iloc[0].to_dict()
-    return hashlib.sha256(
-        json.dumps(payload, sort_keys=True).encode()
-    ).hexdigest()
+    # Raw float64 row bytes + column names; keys are process-local only
+    raw = features.to_numpy(dtype=np.float64)[0].tobytes()
+    raw += "\x1f".join(features.columns).encode()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def _top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k largest values, largest first (O(n) selection).
+    """
+    k = max(0, min(k, values.shape[0]))
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+
+    idx = np.argpartition(-values, k - 1)[:k]
+    return idx[np.argsort(-values[idx])]
+
+
+def _contributions(
+    columns: pd.Index,
+    impacts: np.ndarray,
+    idx: np.ndarray
+) -> List[Dict]:
+    return [
+        {"feature": feature, "impact": round(impact, 4)}
+        for feature, impact in zip(columns[idx].tolist(), impacts[idx].tolist())
+    ]
 
 
 def explain_prediction(
@@ -47,33 +89,36 @@ def explain_prediction(
     cache_key = _hash_features(features)
 
     # Cache hit
-    if cache_key in _SHAP_CACHE:
-        return _SHAP_CACHE[cache_key]
+    with _SHAP_LOCK:
+        cached = _SHAP_CACHE.get(cache_key)
+        if cached is not None:
+            _SHAP_CACHE.move_to_end(cache_key)
+            return cached
 
     explainer = _get_explainer()
-    shap_values = explainer.shap_values(features)
+    # Raw ndarray skips SHAP's DataFrame conversion and name checks
+    shap_values = explainer.shap_values(
+        features.to_numpy(dtype=np.float64), check_additivity=False
+    )
 
     if isinstance(shap_values, list):
         shap_values = shap_values[1]
 
-    contributions = (
-        pd.DataFrame({
-            "feature": features.columns,
-            "impact": shap_values[0]
-        })
-        .sort_values("impact", ascending=False)
-    )
+    impacts = np.asarray(shap_values[0], dtype=np.float64)
 
     explanation = {
-        "risk_drivers": [
-            {"feature": r.feature, "impact": round(r.impact, 4)}
-            for r in contributions.head(top_k).itertuples()
-        ],
-        "protective_factors": [
-            {"feature": r.feature, "impact": round(r.impact, 4)}
-            for r in contributions.tail(top_k).sort_values("impact").itertuples()
-        ]
+        "risk_drivers": _contributions(
+            features.columns, impacts, _top_k_indices(impacts, top_k)
+        ),
+        "protective_factors": _contributions(
+            features.columns, impacts, _top_k_indices(-impacts, top_k)
+        )
     }
 
-    _SHAP_CACHE[cache_key] = explanation
+    with _SHAP_LOCK:
+        _SHAP_CACHE[cache_key] = explanation
+        _SHAP_CACHE.move_to_end(cache_key)
+        if len(_SHAP_CACHE) > _SHAP_CACHE_MAXSIZE:
+            _SHAP_CACHE.popitem(last=False)
+
     return explanation
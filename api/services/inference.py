@@ -1,10 +1,28 @@
+import asyncio
+import functools
 import json
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import joblib
+import numpy as np
 import pandas as pd
+from numba import njit
+
+try:
+    import tl2cgen
+    TL2CGEN_AVAILABLE = True
+except ImportError:
+    TL2CGEN_AVAILABLE = False
+
+try:
+    import onnxruntime as ort
+    ORT_AVAILABLE = True
+except ImportError:
+    ORT_AVAILABLE = False
 
 from api.services.metrics import metrics_store
 
@@ -14,24 +32,106 @@ logger = logging.getLogger("credit-risk-api")
 ARTIFACTS_DIR = Path(__file__).resolve().parents[2] / "artifacts" / "model"
 
 MODEL_PATH = ARTIFACTS_DIR / "gradient_boosting_model.joblib"
+ONNX_MODEL_PATH = ARTIFACTS_DIR / "gradient_boosting_model.onnx"
+TREELITE_LIB_PATH = ARTIFACTS_DIR / "libmodel.so"
 THRESHOLD_PATH = ARTIFACTS_DIR / "decision_threshold.json"
 METADATA_PATH = ARTIFACTS_DIR / "model_metadata.json"
 
-# Load artifacts once
+ONNX_INPUT_NAME = "input"
+
+# Load artifacts once (sklearn model is kept for SHAP and as fallback)
 model = joblib.load(MODEL_PATH)
 
+# Compiled Treelite predictor, built by `python -m tools.compile_treelite`
+_predictor = None
+
+if TL2CGEN_AVAILABLE and TREELITE_LIB_PATH.exists():
+    # Parallelism comes from the request pool / micro-batching
+    _predictor = tl2cgen.Predictor(str(TREELITE_LIB_PATH), nthread=1)
+
+# ONNX Runtime session, built by `python -m tools.export_onnx`
+_session = None
+
+if _predictor is None and ORT_AVAILABLE and ONNX_MODEL_PATH.exists():
+    _sess_options = ort.SessionOptions()
+    # Parallelism comes from the request pool / micro-batching
+    _sess_options.intra_op_num_threads = 1
+    _sess_options.inter_op_num_threads = 1
+
+    _session = ort.InferenceSession(
+        str(ONNX_MODEL_PATH),
+        sess_options=_sess_options,
+        providers=["CPUExecutionProvider"]
+    )
+
 with open(THRESHOLD_PATH, "r") as f:
     _thresholds = json.load(f)
 
 with open(METADATA_PATH, "r") as f:
     _metadata = json.load(f)
 
-APPROVE_THRESHOLD = _thresholds.get("approve", 0.3)
-CONDITIONAL_THRESHOLD = _thresholds.get("conditional", 0.6)
+APPROVE_THRESHOLD = float(_thresholds.get("approve", 0.3))
+CONDITIONAL_THRESHOLD = float(_thresholds.get("conditional", 0.6))
 
 MODEL_NAME = _metadata.get("model_name")
 MODEL_VERSION = _metadata.get("model_version")
 
+# Index order matches the codes returned by _decide_vec
+DECISION_LABELS = np.array(
+    ["APPROVE", "CONDITIONAL_APPROVAL", "REJECT"], dtype=object
+)
+
+# Bounded pool for CPU-bound preprocessing / model calls
+inference_executor = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1,
+    thread_name_prefix="inference"
+)
+
+
+async def run_in_inference_pool(func: Callable, *args: Any, **kwargs: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        inference_executor,
+        functools.partial(func, *args, **kwargs)
+    )
+
+
+def check_finite(values: np.ndarray) -> None:
+    # Native backends score NaN/inf silently; sklearn rejected them
+    if not np.isfinite(values).all():
+        raise ValueError("Input features contain NaN or infinity")
+
+
+def _predict(features: pd.DataFrame) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Return predicted labels and probability of default for each row.
+    """
+    values = features.to_numpy(dtype=np.float64)
+    check_finite(values)
+
+    if _predictor is not None:
+        probabilities = _predictor.predict(
+            tl2cgen.DMatrix(values.astype(np.float32))
+        ).reshape(-1)
+        # Same tie-breaking as argmax over [1 - p, p]
+        labels = model.classes_.take((probabilities > 0.5).astype(np.intp))
+        return labels, probabilities
+
+    if _session is not None:
+        labels, probabilities = _session.run(
+            None,
+            {ONNX_INPUT_NAME: values.astype(np.float32)}
+        )
+        return labels, probabilities[:, 1]
+
+    if not hasattr(model, "predict_proba"):
+        return model.predict(features), None
+
+    # Single tree traversal: predict() is argmax over predict_proba()
+    probabilities = model.predict_proba(features)
+    labels = model.classes_.take(np.argmax(probabilities, axis=1))
+    return labels, probabilities[:, 1]
+
 
 def _make_decision(probability: Optional[float]) -> str:
     if probability is None:
@@ -43,6 +143,27 @@ def _make_decision(probability: Optional[float]) -> str:
     return "REJECT"
 
 
+# Explicit signature: compiled (or loaded from cache) at import, not on
+# the first request
+@njit("int8[:](float64[:], float64, float64)", cache=True)
+def _decide_vec(
+    probabilities: np.ndarray,
+    approve_threshold: float,
+    conditional_threshold: float
+) -> np.ndarray:
+    # Vectorized _make_decision: 0=APPROVE, 1=CONDITIONAL_APPROVAL, 2=REJECT
+    decisions = np.empty(probabilities.shape[0], dtype=np.int8)
+    for i in range(probabilities.shape[0]):
+        probability = probabilities[i]
+        if probability < approve_threshold:
+            decisions[i] = 0
+        elif probability < conditional_threshold:
+            decisions[i] = 1
+        else:
+            decisions[i] = 2
+    return decisions
+
+
 def run_inference(
     features: pd.DataFrame,
     request_id: Optional[str] = None
@@ -50,23 +171,26 @@ def run_inference(
     if not isinstance(features, pd.DataFrame):
         raise TypeError("features must be a pandas DataFrame")
 
-    prediction = int(model.predict(features)[0])
+    predictions, probabilities = _predict(features)
+
+    prediction = int(predictions[0])
 
     probability = (
-        float(model.predict_proba(features)[0][1])
-        if hasattr(model, "predict_proba")
+        float(probabilities[0])
+        if probabilities is not None
         else None
     )
 
     decision = _make_decision(probability)
 
     logger.info(
-        f"request_id={request_id} "
-        f"prediction={prediction} "
-        f"pd={round(probability, 4) if probability is not None else 'NA'} "
-        f"decision={decision} "
-        f"model={MODEL_NAME} "
-        f"version={MODEL_VERSION}"
+        "request_id=%s prediction=%s pd=%s decision=%s model=%s version=%s",
+        request_id,
+        prediction,
+        round(probability, 4) if probability is not None else "NA",
+        decision,
+        MODEL_NAME,
+        MODEL_VERSION
     )
 
     metrics_store.record_decision(decision)
@@ -80,41 +204,83 @@ def run_inference(
     }
 
 
-def run_inference_batch(
+def run_inference_columns(
     features: pd.DataFrame,
     request_id: Optional[str] = None
-) -> List[Dict]:
+) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """
+    Score a batch and return (columns, decision_counts): column arrays
+    decision, prediction, probability_of_default (one entry per row) and
+    the number of rows per decision.
+    """
     if not isinstance(features, pd.DataFrame):
         raise TypeError("features must be a pandas DataFrame")
 
-    predictions = model.predict(features)
+    predictions, probabilities = _predict(features)
+    batch_size = len(predictions)
+
+    if probabilities is None:
+        decisions = ["UNKNOWN"] * batch_size
+        probabilities = [None] * batch_size
+        decision_counts = {"UNKNOWN": batch_size}
+    else:
+        # Backends may return a strided column view; orjson needs C order
+        probabilities = np.ascontiguousarray(probabilities, dtype=np.float64)
+        decision_idx = _decide_vec(
+            probabilities, APPROVE_THRESHOLD, CONDITIONAL_THRESHOLD
+        )
+        decisions = DECISION_LABELS[decision_idx].tolist()
 
-    probabilities = (
-        model.predict_proba(features)[:, 1]
-        if hasattr(model, "predict_proba")
-        else [None] * len(predictions)
+        counts = np.bincount(decision_idx, minlength=len(DECISION_LABELS))
+        decision_counts = {
+            decision: int(count)
+            for decision, count in zip(DECISION_LABELS, counts)
+            if count
+        }
+
+    for decision, count in decision_counts.items():
+        metrics_store.record_decision(decision, count)
+
+    logger.info(
+        "request_id=%s batch_size=%s model=%s version=%s",
+        request_id,
+        batch_size,
+        MODEL_NAME,
+        MODEL_VERSION
     )
 
-    results: List[Dict] = []
+    columns = {
+        "decision": decisions,
+        "prediction": np.asarray(predictions, dtype=np.int32),
+        "probability_of_default": probabilities,
+    }
 
-    for pred, prob in zip(predictions, probabilities):
-        decision = _make_decision(prob)
+    return columns, decision_counts
 
-        metrics_store.record_decision(decision)
 
-        results.append({
+def run_inference_batch(
+    features: pd.DataFrame,
+    request_id: Optional[str] = None
+) -> List[Dict]:
+    columns, _ = run_inference_columns(
+        features=features, request_id=request_id
+    )
+
+    probabilities = columns["probability_of_default"]
+    if isinstance(probabilities, np.ndarray):
+        probabilities = probabilities.tolist()
+
+    return [
+        {
             "decision": decision,
-            "prediction": int(pred),
-            "probability_of_default": float(prob) if prob is not None else None,
+            "prediction": pred,
+            "probability_of_default": prob,
             "model_name": MODEL_NAME,
             "model_version": MODEL_VERSION,
-        })
-
-    logger.info(
-        f"request_id={request_id} "
-        f"batch_size={len(results)} "
-        f"model={MODEL_NAME} "
-        f"version={MODEL_VERSION}"
-    )
-
-    return results
+        }
+        for decision, pred, prob in zip(
+            columns["decision"],
+            columns["prediction"].tolist(),
+            probabilities
+        )
+    ]
@@ -1,70 +1,94 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from threading import Lock
-from typing import Dict
+from threading import Lock, local
+from typing import Dict, List
 
 
 @dataclass
-class _Requests:
+class _Counters:
+    """
+    Per-thread accumulators; only the owning thread writes to them.
+    """
     total: int = 0
     single: int = 0
     batch_records: int = 0
-
-
-@dataclass
-class _Latency:
-    average: float = 0.0
-    last: float = 0.0
-    _count: int = 0
+    latency_sum: float = 0.0
+    latency_count: int = 0
+    model_decisions: Dict[str, int] = field(default_factory=dict)
 
 
 @dataclass
 class _MetricsStore:
+    # Guards shard registration only (once per thread), never the hot path
     _lock: Lock = field(default_factory=Lock)
 
-    _requests: _Requests = field(default_factory=_Requests)
-    _latency: _Latency = field(default_factory=_Latency)
-    _model_decisions: Dict[str, int] = field(default_factory=dict)
+    _local: local = field(default_factory=local)
+    _shards: List[_Counters] = field(default_factory=list)
+    _last_latency: float = 0.0
+
+    def _counters(self) -> _Counters:
+        counters = getattr(self._local, "counters", None)
+        if counters is None:
+            counters = _Counters()
+            with self._lock:
+                self._shards.append(counters)
+            self._local.counters = counters
+        return counters
 
     def record_request(self, duration_ms: float) -> None:
-        with self._lock:
-            self._requests.total += 1
-            self._latency.last = float(duration_ms)
-            self._latency._count += 1
-            n = self._latency._count
-            self._latency.average = (
-                (self._latency.average * (n - 1)) + duration_ms) / n
+        counters = self._counters()
+        counters.total += 1
+        counters.latency_sum += duration_ms
+        counters.latency_count += 1
+        self._last_latency = float(duration_ms)
 
     def record_single(self) -> None:
-        with self._lock:
-            self._requests.single += 1
+        self._counters().single += 1
 
     def record_batch(self, batch_size: int) -> None:
-        with self._lock:
-            self._requests.batch_records += int(batch_size)
+        self._counters().batch_records += int(batch_size)
 
-    def record_decision(self, decision: str) -> None:
+    def record_decision(self, decision: str, count: int = 1) -> None:
         if not decision:
             return
-        with self._lock:
-            self._model_decisions[decision] = self._model_decisions.get(
-                decision, 0) + 1
+        decisions = self._counters().model_decisions
+        decisions[decision] = decisions.get(decision, 0) + int(count)
 
     def snapshot(self) -> Dict:
         with self._lock:
-            return {
-                "requests": {
-                    "total": self._requests.total,
-                    "single": self._requests.single,
-                    "batch_records": self._requests.batch_records,
-                },
-                "latency_ms": {
-                    "average": round(self._latency.average, 2),
-                    "last": round(self._latency.last, 2),
-                },
-                "model_decisions": dict(self._model_decisions),
-            }
+            shards = list(self._shards)
+
+        total = single = batch_records = latency_count = 0
+        latency_sum = 0.0
+        model_decisions: Dict[str, int] = {}
+
+        for shard in shards:
+            total += shard.total
+            single += shard.single
+            batch_records += shard.batch_records
+            latency_sum += shard.latency_sum
+            latency_count += shard.latency_count
+
+            # dict() copies in one step, safe against concurrent inserts
+            for decision, count in dict(shard.model_decisions).items():
+                model_decisions[decision] = model_decisions.get(
+                    decision, 0) + count
+
+        average = latency_sum / latency_count if latency_count else 0.0
+
+        return {
+            "requests": {
+                "total": total,
+                "single": single,
+                "batch_records": batch_records,
+            },
+            "latency_ms": {
+                "average": round(average, 2),
+                "last": round(self._last_latency, 2),
+            },
+            "model_decisions": model_decisions,
+        }
 
 
 metrics_store = _MetricsStore()
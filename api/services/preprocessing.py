@@ -1,10 +1,15 @@
 import json
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
-from pipeline.cleaning import clean_raw_data
-from pipeline.features import engineer_features
-from api.services.schema import validate_raw_schema
+from pipeline.cleaning import NUMERIC_CLIP_BOUNDS, clean_raw_data
+from pipeline.features import LOAN_GRADE_MAPPING, engineer_features
+from api.services.schema import (
+    RAW_CATEGORICAL_DOMAINS,
+    RAW_REQUIRED_COLUMNS,
+    validate_raw_schema,
+)
 
 # Load feature schema (authoritative ML contract)
 ARTIFACTS_DIR = Path(__file__).resolve().parents[2] / "artifacts" / "model"
@@ -17,19 +22,138 @@ with open(FEATURE_SCHEMA_PATH, "r") as f:
 EXPECTED_FEATURES: list[str] = _schema["feature_names"]
 NUM_FEATURES: int = _schema["num_features"]
 
+_FEATURE_COLUMNS = pd.Index(EXPECTED_FEATURES)
+_EXPECTED_SET = frozenset(EXPECTED_FEATURES)
+
+
+# Single-record fast path (generated at import from the feature contract)
+#
+# Mirrors validate_raw_schema -> clean_raw_data -> engineer_features for one
+# payload dict, without building intermediate DataFrames.
+
+_NUMERIC_FEATURES = {
+    "Age": "person_age",
+    "Annual Income": "person_income",
+    "Employment Length (years)": "person_emp_length",
+    "Loan Amount": "loan_amnt",
+    "Interest Rate": "loan_int_rate",
+    "Loan to Income Ratio": "loan_percent_income",
+    "Credit History Length (years)": "cb_person_cred_hist_length",
+}
+
+_ONE_HOT_FEATURES = {
+    "Home Ownership_": "person_home_ownership",
+    "Loan Intent_": "loan_intent",
+    "Has Defaulted_": "cb_person_default_on_file",
+}
+
+
+def _to_number(value) -> float:
+    # Same outcome as pd.to_numeric(errors="coerce") for a scalar
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _invalid_value_message(column: str, value: str) -> str:
+    return (
+        f"Invalid {column} values: {[value]}. "
+        f"Allowed: {sorted(RAW_CATEGORICAL_DOMAINS[column])}"
+    )
+
+
+def _feature_expression(feature: str) -> str:
+    if feature in _NUMERIC_FEATURES:
+        return f"v_{_NUMERIC_FEATURES[feature]}"
+
+    for prefix, column in _ONE_HOT_FEATURES.items():
+        if feature.startswith(prefix):
+            category = feature[len(prefix):]
+            return f"1.0 if v_{column} == {category!r} else 0.0"
+
+    if feature == "loan_grade_encoded":
+        return "_LOAN_GRADE_MAPPING.get(v_loan_grade, 0)"
+
+    # engineer_features fills unknown contract columns with 0
+    return "0.0"
+
+
+def _generate_fast_preprocess_single():
+    lines = [
+        "def fast_preprocess_single(payload):",
+        "    missing = [c for c in _RAW_REQUIRED_COLUMNS if c not in payload]",
+        "    if missing:",
+        "        raise ValueError(",
+        "            'Missing required raw input columns: ' + ', '.join(missing)",
+        "        )",
+    ]
+
+    for column, allowed in RAW_CATEGORICAL_DOMAINS.items():
+        # Set literal in a membership test compiles to a frozenset constant
+        allowed_literal = "{" + ", ".join(map(repr, sorted(allowed))) + "}"
+        lines += [
+            f"    v_{column} = str(payload[{column!r}]).strip().upper()",
+            f"    if v_{column} not in {allowed_literal}:",
+            f"        raise ValueError(_invalid_value_message({column!r}, v_{column}))",
+        ]
+
+    for column, (lower, upper) in NUMERIC_CLIP_BOUNDS.items():
+        lines.append(f"    v_{column} = _to_number(payload[{column!r}])")
+        if lower is not None:
+            lines += [
+                f"    if v_{column} < {float(lower)!r}:",
+                f"        v_{column} = {float(lower)!r}",
+            ]
+        if upper is not None:
+            lines += [
+                f"    if v_{column} > {float(upper)!r}:",
+                f"        v_{column} = {float(upper)!r}",
+            ]
+
+    lines.append("    return _np.array([[")
+    lines += [
+        f"        {_feature_expression(feature)},  # {feature}"
+        for feature in EXPECTED_FEATURES
+    ]
+    lines.append("    ]], dtype=_np.float64)")
+
+    namespace = {
+        "_np": np,
+        "_to_number": _to_number,
+        "_invalid_value_message": _invalid_value_message,
+        "_LOAN_GRADE_MAPPING": LOAN_GRADE_MAPPING,
+        "_RAW_REQUIRED_COLUMNS": tuple(RAW_REQUIRED_COLUMNS),
+    }
+    code = compile("\n".join(lines), "<fast_preprocess_single>", "exec")
+    exec(code, namespace)
+
+    return namespace["fast_preprocess_single"]
+
+
+fast_preprocess_single = _generate_fast_preprocess_single()
+
 
 # Internal validation
 def _validate_feature_schema(df_features: pd.DataFrame) -> None:
     """
     Ensure engineered features exactly match the model contract.
     """
-    missing = [c for c in EXPECTED_FEATURES if c not in df_features.columns]
-    extra = [c for c in df_features.columns if c not in EXPECTED_FEATURES]
+    columns = df_features.columns
+
+    # Fast path: exact contract columns (same object or same labels in order)
+    if columns is _FEATURE_COLUMNS or columns.equals(_FEATURE_COLUMNS):
+        return
+
+    missing = _EXPECTED_SET.difference(columns)
+    extra = set(columns).difference(_EXPECTED_SET)
 
     if missing:
+        missing = [c for c in EXPECTED_FEATURES if c in missing]
         raise ValueError(f"Missing required engineered features: {missing}")
 
     if extra:
+        extra = [c for c in columns if c in extra]
         raise ValueError(f"Unexpected engineered features produced: {extra}")
 
     if df_features.shape[1] != NUM_FEATURES:
@@ -39,25 +163,46 @@ def _validate_feature_schema(df_features: pd.DataFrame) -> None:
         )
 
 
+# Public API — model boundary
+def features_frame(features: np.ndarray) -> pd.DataFrame:
+    """
+    Wrap model-ready feature rows in a DataFrame with the contract columns.
+    """
+    # The model was fit with feature names; no copy of the rows is made
+    return pd.DataFrame(features, columns=_FEATURE_COLUMNS, copy=False)
+
+
 # Public API — single request preprocessing
-def preprocess_request(payload: dict) -> pd.DataFrame:
+def preprocess_request_array(payload: dict) -> np.ndarray:
     """
-    Preprocess a single credit application payload into model-ready features.
+    Preprocess a single credit application payload into a (1, NUM_FEATURES)
+    float64 row, ordered as EXPECTED_FEATURES.
     """
 
     if not isinstance(payload, dict):
         raise TypeError("Payload must be a dictionary")
 
-    # Convert to DataFrame
-    df_raw = pd.DataFrame([payload])
+    # Validation, cleaning and feature engineering in one generated pass;
+    # the output columns are the feature contract by construction.
+    return fast_preprocess_single(payload)
+
 
-    # 1️⃣ RAW schema validation (serving-time contract)
+def preprocess_request(payload: dict) -> pd.DataFrame:
+    """
+    Preprocess a single credit application payload into model-ready features.
+    """
+    return features_frame(preprocess_request_array(payload))
+
+
+# Shared batch pipeline
+def _preprocess_frame(df_raw: pd.DataFrame) -> pd.DataFrame:
+    # 1️⃣ RAW schema validation (once per batch)
     validate_raw_schema(df_raw)
 
-    # 2️⃣ Cleaning
+    # 2️⃣ Cleaning (vectorized)
     df_clean = clean_raw_data(df_raw)
 
-    # 3️⃣ Feature engineering
+    # 3️⃣ Feature engineering (vectorized)
     df_features = engineer_features(
         df_clean=df_clean,
         expected_features=EXPECTED_FEATURES,
@@ -82,21 +227,20 @@ def preprocess_request_batch(payloads: list[dict]) -> pd.DataFrame:
         raise ValueError("Batch payload is empty")
 
     # Convert batch to DataFrame
-    df_raw = pd.DataFrame(payloads)
+    return _preprocess_frame(pd.DataFrame(payloads))
 
-    # 1️⃣ RAW schema validation (once per batch)
-    validate_raw_schema(df_raw)
 
-    # 2️⃣ Cleaning (vectorized)
-    df_clean = clean_raw_data(df_raw)
+# Public API — columnar batch preprocessing
+def preprocess_request_columns(columns: dict[str, list]) -> pd.DataFrame:
+    """
+    Preprocess a batch given as {field: [values, ...]} into model-ready features.
+    """
 
-    # 3️⃣ Feature engineering (vectorized)
-    df_features = engineer_features(
-        df_clean=df_clean,
-        expected_features=EXPECTED_FEATURES,
-    )
+    if not isinstance(columns, dict):
+        raise TypeError("Columnar batch payload must be a dictionary of lists")
 
-    # 4️⃣ Feature schema enforcement
-    _validate_feature_schema(df_features)
+    if not columns or not len(next(iter(columns.values()))):
+        raise ValueError("Batch payload is empty")
 
-    return df_features
+    # Columnar input maps straight onto DataFrame columns (no row transpose)
+    return _preprocess_frame(pd.DataFrame(columns))
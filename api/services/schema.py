@@ -30,52 +30,61 @@ RAW_ALLOWED_DEFAULT_ON_FILE = {"Y", "N"}
 RAW_ALLOWED_LOAN_GRADE = {"A", "B", "C", "D", "E", "F", "G"}
 
 
-def _normalize(series: pd.Series) -> pd.Series:
-    return series.astype(str).str.strip().str.upper()
+# Categorical columns in check order, with their allowed (normalized) values
+RAW_CATEGORICAL_DOMAINS = {
+    "person_home_ownership": RAW_ALLOWED_HOME_OWNERSHIP,
+    "loan_intent": RAW_ALLOWED_LOAN_INTENT,
+    "cb_person_default_on_file": RAW_ALLOWED_DEFAULT_ON_FILE,
+    "loan_grade": RAW_ALLOWED_LOAN_GRADE,
+}
+
+
+def _normalize(value) -> str:
+    return str(value).strip().upper()
+
+
+def _generate_validator():
+    """
+    Build a straight-line validator with column names and allowed values
+    inlined as constants.
+    """
+    lines = [
+        "def _validate(df_raw):",
+        "    columns = df_raw.columns",
+        "    missing = [c for c in _RAW_REQUIRED_COLUMNS if c not in columns]",
+        "    if missing:",
+        "        raise ValueError(",
+        "            'Missing required raw input columns: ' + ', '.join(missing)",
+        "        )",
+    ]
+
+    for column, allowed in RAW_CATEGORICAL_DOMAINS.items():
+        allowed_literal = "{" + ", ".join(map(repr, sorted(allowed))) + "}"
+        lines += [
+            # Normalize distinct raw values only (few per column)
+            f"    bad = {{_normalize(v) for v in set(df_raw[{column!r}].values)}}",
+            f"    bad -= {allowed_literal}",
+            "    if bad:",
+            "        raise ValueError(",
+            f"            f'Invalid {column} values: {{sorted(bad)}}. '",
+            f"            {f'Allowed: {sorted(allowed)}'!r}",
+            "        )",
+        ]
+
+    namespace = {
+        "_normalize": _normalize,
+        "_RAW_REQUIRED_COLUMNS": tuple(RAW_REQUIRED_COLUMNS),
+    }
+    exec(compile("\n".join(lines), "<validate_raw_schema>", "exec"), namespace)
+
+    return namespace["_validate"]
+
+
+_validate = _generate_validator()
 
 
 def validate_raw_schema(df_raw: pd.DataFrame) -> None:
     if not isinstance(df_raw, pd.DataFrame):
         raise TypeError("Raw input must be a pandas DataFrame")
 
-    # Required columns
-    missing = [c for c in RAW_REQUIRED_COLUMNS if c not in df_raw.columns]
-    if missing:
-        raise ValueError(
-            "Missing required raw input columns: " + ", ".join(missing)
-        )
-
-    # person_home_ownership
-    bad_home = set(_normalize(
-        df_raw["person_home_ownership"])) - RAW_ALLOWED_HOME_OWNERSHIP
-    if bad_home:
-        raise ValueError(
-            f"Invalid person_home_ownership values: {sorted(bad_home)}. "
-            f"Allowed: {sorted(RAW_ALLOWED_HOME_OWNERSHIP)}"
-        )
-
-    # loan_intent
-    bad_intent = set(_normalize(
-        df_raw["loan_intent"])) - RAW_ALLOWED_LOAN_INTENT
-    if bad_intent:
-        raise ValueError(
-            f"Invalid loan_intent values: {sorted(bad_intent)}. "
-            f"Allowed: {sorted(RAW_ALLOWED_LOAN_INTENT)}"
-        )
-
-    # cb_person_default_on_file
-    bad_default = set(_normalize(
-        df_raw["cb_person_default_on_file"])) - RAW_ALLOWED_DEFAULT_ON_FILE
-    if bad_default:
-        raise ValueError(
-            f"Invalid cb_person_default_on_file values: {sorted(bad_default)}. "
-            f"Allowed: {sorted(RAW_ALLOWED_DEFAULT_ON_FILE)}"
-        )
-
-    # loan_grade
-    bad_grade = set(_normalize(df_raw["loan_grade"])) - RAW_ALLOWED_LOAN_GRADE
-    if bad_grade:
-        raise ValueError(
-            f"Invalid loan_grade values: {sorted(bad_grade)}. "
-            f"Allowed: {sorted(RAW_ALLOWED_LOAN_GRADE)}"
-        )
+    _validate(df_raw)
@@ -1,5 +1,16 @@
 import pandas as pd
 
+# (lower, upper) clip bounds per numeric column; None = unbounded
+NUMERIC_CLIP_BOUNDS = {
+    "person_age": (18, 100),
+    "person_income": (0, None),
+    "person_emp_length": (0, 60),
+    "loan_amnt": (0, None),
+    "loan_int_rate": (0, 100),
+    "loan_percent_income": (0, 5),
+    "cb_person_cred_hist_length": (0, 80),
+}
+
 
 def clean_raw_data(df_raw: pd.DataFrame) -> pd.DataFrame:
     df = df_raw.copy()
@@ -25,13 +36,8 @@ def clean_raw_data(df_raw: pd.DataFrame) -> pd.DataFrame:
         df[c] = pd.to_numeric(df[c], errors="coerce")
 
     # Basic sanity handling (light-touch)
-    df["person_age"] = df["person_age"].clip(lower=18, upper=100)
-    df["person_income"] = df["person_income"].clip(lower=0)
-    df["person_emp_length"] = df["person_emp_length"].clip(lower=0, upper=60)
-    df["loan_amnt"] = df["loan_amnt"].clip(lower=0)
-    df["loan_int_rate"] = df["loan_int_rate"].clip(lower=0, upper=100)
-    df["loan_percent_income"] = df["loan_percent_income"].clip(lower=0, upper=5)
-    df["cb_person_cred_hist_length"] = df["cb_person_cred_hist_length"].clip(lower=0, upper=80)
+    for c, (lower, upper) in NUMERIC_CLIP_BOUNDS.items():
+        df[c] = df[c].clip(lower=lower, upper=upper)
 
     # Missing numeric values -> median per column
     for c in numeric_cols:
@@ -1,9 +1,10 @@
 import pandas as pd
 
+LOAN_GRADE_MAPPING = {"A": 1, "B": 2, "C": 3, "D": 4, "E": 5, "F": 6, "G": 7}
+
 
 def _encode_loan_grade(series: pd.Series) -> pd.Series:
-    mapping = {"A": 1, "B": 2, "C": 3, "D": 4, "E": 5, "F": 6, "G": 7}
-    return series.map(mapping).fillna(0).astype(int)
+    return series.map(LOAN_GRADE_MAPPING).fillna(0).astype(int)
 
 
 def engineer_features(df_clean: pd.DataFrame, expected_features: list[str]) -> pd.DataFrame:
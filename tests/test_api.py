@@ -1,8 +1,38 @@
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
 from fastapi.testclient import TestClient
 from api.main import app
+from api.services import inference
+from api.services import batching
+from api.services.batching import MicroBatcher
+from api.services.metrics import _MetricsStore
+from api.services.preprocessing import (
+    preprocess_request,
+    preprocess_request_array,
+    preprocess_request_batch
+)
 
 client = TestClient(app)
 
+PAYLOAD = {
+    "person_age": 30,
+    "person_income": 60000,
+    "person_home_ownership": "RENT",
+    "person_emp_length": 4,
+    "loan_intent": "PERSONAL",
+    "loan_grade": "B",
+    "loan_amnt": 12000,
+    "loan_int_rate": 12.0,
+    "loan_percent_income": 0.2,
+    "cb_person_default_on_file": "N",
+    "cb_person_cred_hist_length": 7
+}
+
 
 def test_health():
     r = client.get("/health")
@@ -10,20 +40,340 @@ def test_health():
 
 
 def test_predict():
-    payload = {
-        "person_age": 30,
-        "person_income": 60000,
-        "person_home_ownership": "RENT",
-        "person_emp_length": 4,
-        "loan_intent": "PERSONAL",
-        "loan_grade": "B",
-        "loan_amnt": 12000,
-        "loan_int_rate": 12.0,
-        "loan_percent_income": 0.2,
-        "cb_person_default_on_file": "N",
-        "cb_person_cred_hist_length": 7
+    r = client.post("/predict", json=PAYLOAD)
+    assert r.status_code == 200
+    assert "decision" in r.json()
+
+
+def test_predict_with_micro_batcher_running():
+    with TestClient(app) as c:
+        r = c.post("/predict", json=PAYLOAD)
+
+    assert r.status_code == 200
+    assert r.json() == client.post("/predict", json=PAYLOAD).json()
+
+
+def test_micro_batcher_coalesces_concurrent_requests(monkeypatch):
+    row = preprocess_request_array(dict(PAYLOAD))
+    batch_sizes = []
+    score_rows = batching._score_rows
+
+    def spy_score_rows(rows, request_id):
+        batch_sizes.append(len(rows))
+        return score_rows(rows, request_id)
+
+    monkeypatch.setattr(batching, "_score_rows", spy_score_rows)
+
+    async def score_concurrently():
+        batcher = MicroBatcher(max_batch_size=8, max_latency_ms=50)
+        batcher.start()
+        try:
+            return await asyncio.gather(
+                *(batcher.submit(row, f"req-{i}") for i in range(5))
+            )
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(score_concurrently())
+
+    assert batch_sizes == [5]
+    assert len(results) == 5
+    assert all(r == results[0] for r in results)
+
+
+def test_micro_batcher_does_not_hold_lone_request():
+    row = preprocess_request_array(dict(PAYLOAD))
+
+    async def score_alone():
+        batcher = MicroBatcher(max_latency_ms=2000)
+        batcher.start()
+        try:
+            return await asyncio.wait_for(batcher.submit(row), timeout=1)
+        finally:
+            await batcher.stop()
+
+    assert "decision" in asyncio.run(score_alone())
+
+
+def test_micro_batcher_isolates_failing_request(monkeypatch):
+    row = preprocess_request_array(dict(PAYLOAD))
+    score_single = batching._score_single
+
+    def failing_score_rows(rows, request_id):
+        raise RuntimeError("batch failed")
+
+    def flaky_score_single(row, request_id):
+        if request_id == "req-bad":
+            raise RuntimeError("row failed")
+        return score_single(row, request_id)
+
+    monkeypatch.setattr(batching, "_score_rows", failing_score_rows)
+    monkeypatch.setattr(batching, "_score_single", flaky_score_single)
+
+    async def score_concurrently():
+        batcher = MicroBatcher(max_batch_size=8, max_latency_ms=50)
+        batcher.start()
+        try:
+            return await asyncio.gather(
+                *(batcher.submit(row, rid)
+                  for rid in ("req-0", "req-bad", "req-2")),
+                return_exceptions=True
+            )
+        finally:
+            await batcher.stop()
+
+    good, bad, other = asyncio.run(score_concurrently())
+
+    assert isinstance(bad, RuntimeError)
+    assert "decision" in good
+    assert other == good
+
+
+def test_micro_batcher_rejects_non_finite_row():
+    row = preprocess_request_array(dict(PAYLOAD))
+    row[0, 0] = np.nan
+
+    async def submit():
+        batcher = MicroBatcher()
+        batcher.start()
+        try:
+            await batcher.submit(row)
+        finally:
+            await batcher.stop()
+
+    with pytest.raises(ValueError):
+        asyncio.run(submit())
+
+
+def test_micro_batcher_stop_fails_pending_requests():
+    row = preprocess_request_array(dict(PAYLOAD))
+
+    async def stop_with_pending():
+        batcher = MicroBatcher()
+        batcher.start()
+        pending = asyncio.ensure_future(batcher.submit(row))
+        await asyncio.sleep(0)
+        await batcher.stop()
+        return await asyncio.wait_for(pending, timeout=1)
+
+    with pytest.raises(RuntimeError, match="stopped"):
+        asyncio.run(stop_with_pending())
+
+
+def test_predict_batch():
+    r = client.post("/predict/batch", json=[PAYLOAD, PAYLOAD])
+    assert r.status_code == 200
+
+    body = r.json()
+    single = client.post("/predict", json=PAYLOAD).json()
+
+    assert body["batch_size"] == 2
+    assert body["model_version"] == single["model_version"]
+    assert body["results"]["decision"] == [single["decision"]] * 2
+    assert body["results"]["probability_of_default"] == pytest.approx(
+        [single["probability_of_default"]] * 2
+    )
+
+
+def test_predict_batch_with_sklearn_backend(monkeypatch):
+    monkeypatch.setattr(inference, "_predictor", None)
+    monkeypatch.setattr(inference, "_session", None)
+
+    r = client.post("/predict/batch", json=[PAYLOAD, PAYLOAD])
+    assert r.status_code == 200
+    assert r.json()["results"]["prediction"] == [0, 0]
+
+
+def test_predict_batch_rejects_invalid_record():
+    r = client.post(
+        "/predict/batch",
+        json=[PAYLOAD, {**PAYLOAD, "person_income": "lots"}]
+    )
+    assert r.status_code == 422
+
+    detail = r.json()["detail"]
+    assert isinstance(detail, list)
+    assert detail[0]["loc"] == ["body", 1, "person_income"]
+    assert detail[0]["type"] == "float_parsing"
+
+
+def test_predict_batch_matches_predict_validation():
+    record = {**PAYLOAD, "person_age": True}
+
+    single = client.post("/predict", json=record)
+    batch = client.post("/predict/batch", json=[record])
+
+    assert single.status_code == batch.status_code == 200
+    assert batch.json()["results"]["decision"] == [single.json()["decision"]]
+
+
+@pytest.mark.parametrize("overrides", [
+    {},
+    {"person_age": 12, "loan_percent_income": 7.5, "person_emp_length": 90},
+    {"person_home_ownership": " own ", "loan_intent": "venture",
+     "loan_grade": "g", "cb_person_default_on_file": "y"},
+])
+def test_single_preprocessing_matches_batch_pipeline(overrides):
+    payload = {**PAYLOAD, **overrides}
+
+    pd.testing.assert_frame_equal(
+        preprocess_request(payload),
+        preprocess_request_batch([payload]),
+        check_dtype=False
+    )
+
+
+def test_single_preprocessing_rejects_unknown_category():
+    payload = {**PAYLOAD, "loan_grade": "Z"}
+
+    with pytest.raises(ValueError) as single_err:
+        preprocess_request(payload)
+    with pytest.raises(ValueError) as batch_err:
+        preprocess_request_batch([payload])
+
+    assert str(single_err.value) == str(batch_err.value)
+
+
+def test_vectorized_decisions_match_make_decision():
+    probabilities = np.array([0.0, 0.1, 0.3, 0.45, 0.6, 0.99, np.nan])
+
+    decision_idx = inference._decide_vec(
+        probabilities,
+        inference.APPROVE_THRESHOLD,
+        inference.CONDITIONAL_THRESHOLD
+    )
+
+    assert inference.DECISION_LABELS[decision_idx].tolist() == [
+        inference._make_decision(p) for p in probabilities
+    ]
+
+
+def test_metrics_merge_across_threads():
+    store = _MetricsStore()
+
+    def record(_):
+        for _ in range(1000):
+            store.record_request(2.0)
+            store.record_single()
+            store.record_decision("APPROVE")
+        store.record_batch(10)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(record, range(8)))
+
+    snapshot = store.snapshot()
+
+    assert snapshot["requests"] == {
+        "total": 8000, "single": 8000, "batch_records": 80
     }
+    assert snapshot["latency_ms"] == {"average": 2.0, "last": 2.0}
+    assert snapshot["model_decisions"] == {"APPROVE": 8000}
+
+
+def test_shap_cache_evicts_least_recently_used(monkeypatch):
+    pytest.importorskip("shap")
+    from api.services import explainability
+
+    monkeypatch.setattr(explainability, "_SHAP_CACHE_MAXSIZE", 2)
+    monkeypatch.setattr(explainability, "_SHAP_CACHE", OrderedDict())
+
+    frames = [
+        preprocess_request({**PAYLOAD, "person_age": age})
+        for age in (25, 35, 45)
+    ]
+    for features in frames:
+        explainability.explain_prediction(features)
+
+    assert list(explainability._SHAP_CACHE) == [
+        explainability._hash_features(f) for f in frames[1:]
+    ]
 
-    r = client.post("/predict", json=payload)
+
+def test_predict_explain():
+    pytest.importorskip("shap")
+
+    r = client.post("/predict/explain", json=PAYLOAD)
     assert r.status_code == 200
-    assert "decision" in r.json()
+
+    explanations = r.json()["explanations"]
+    drivers = [d["impact"] for d in explanations["risk_drivers"]]
+    protective = [d["impact"] for d in explanations["protective_factors"]]
+
+    assert drivers == sorted(drivers, reverse=True)
+    assert protective == sorted(protective)
+
+
+def _random_feature_frame(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = [
+        {
+            **PAYLOAD,
+            "person_age": int(rng.integers(18, 80)),
+            "person_income": float(rng.uniform(5_000, 200_000)),
+            "person_home_ownership": str(rng.choice(
+                ["RENT", "OWN", "MORTGAGE", "OTHER"])),
+            "loan_intent": str(rng.choice(
+                ["EDUCATION", "MEDICAL", "PERSONAL", "VENTURE"])),
+            "loan_grade": str(rng.choice(list("ABCDEFG"))),
+            "loan_amnt": float(rng.uniform(500, 40_000)),
+            "loan_int_rate": float(rng.uniform(5, 25)),
+            "loan_percent_income": float(rng.uniform(0, 1)),
+            "cb_person_default_on_file": str(rng.choice(["Y", "N"])),
+        }
+        for _ in range(n)
+    ]
+    return preprocess_request_batch(rows)
+
+
+def _assert_predict_matches_sklearn(tolerance):
+    features = _random_feature_frame()
+
+    labels, probabilities = inference._predict(features)
+
+    np.testing.assert_allclose(
+        probabilities,
+        inference.model.predict_proba(features)[:, 1],
+        rtol=0,
+        atol=tolerance
+    )
+    np.testing.assert_array_equal(labels, inference.model.predict(features))
+
+
+def _assert_predict_rejects_non_finite():
+    for bad in (np.nan, np.inf):
+        features = _random_feature_frame(n=3)
+        features.iloc[1, 1] = bad
+
+        with pytest.raises(ValueError):
+            inference._predict(features)
+
+
+def test_predict_rejects_non_finite_input():
+    r = client.post("/predict", json={**PAYLOAD, "person_income": "nan"})
+    assert r.status_code == 400
+
+
+def test_treelite_backend_matches_sklearn(monkeypatch):
+    tl2cgen = pytest.importorskip("tl2cgen")
+    if not inference.TREELITE_LIB_PATH.exists():
+        pytest.skip("Treelite library not built (python -m tools.compile_treelite)")
+
+    monkeypatch.setattr(inference, "_predictor", tl2cgen.Predictor(
+        str(inference.TREELITE_LIB_PATH), nthread=1))
+
+    _assert_predict_matches_sklearn(tolerance=1e-12)
+    _assert_predict_rejects_non_finite()
+
+
+def test_onnx_backend_matches_sklearn(monkeypatch):
+    ort = pytest.importorskip("onnxruntime")
+    if not inference.ONNX_MODEL_PATH.exists():
+        pytest.skip("ONNX model not exported (python -m tools.export_onnx)")
+
+    monkeypatch.setattr(inference, "_predictor", None)
+    monkeypatch.setattr(inference, "_session", ort.InferenceSession(
+        str(inference.ONNX_MODEL_PATH), providers=["CPUExecutionProvider"]))
+
+    # Tree ensemble runs in float32
+    _assert_predict_matches_sklearn(tolerance=1e-5)
+    _assert_predict_rejects_non_finite()
@@ -0,0 +1 @@
+"""Offline build steps for model serving artifacts."""
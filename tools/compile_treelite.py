@@ -0,0 +1,36 @@
+"""
+Compile the trained sklearn model to a native shared library with Treelite.
+
+Usage:
+    python -m tools.compile_treelite
+"""
+from pathlib import Path
+
+import joblib
+import tl2cgen
+import treelite
+
+ARTIFACTS_DIR = Path(__file__).resolve().parents[1] / "artifacts" / "model"
+
+MODEL_PATH = ARTIFACTS_DIR / "gradient_boosting_model.joblib"
+TREELITE_LIB_PATH = ARTIFACTS_DIR / "libmodel.so"
+
+
+def compile_treelite() -> Path:
+    model = joblib.load(MODEL_PATH)
+
+    tl_model = treelite.sklearn.import_model(model)
+
+    tl2cgen.export_lib(
+        tl_model,
+        toolchain="gcc",
+        libpath=str(TREELITE_LIB_PATH),
+        # quantize: compare integer bin indices instead of float thresholds
+        params={"parallel_comp": 8, "quantize": 1},
+    )
+
+    return TREELITE_LIB_PATH
+
+
+if __name__ == "__main__":
+    print(f"Compiled Treelite model to {compile_treelite()}")
@@ -0,0 +1,44 @@
+"""
+Export the trained sklearn model to ONNX for onnxruntime serving.
+
+Usage:
+    python -m tools.export_onnx
+"""
+import json
+from pathlib import Path
+
+import joblib
+from skl2onnx import to_onnx
+from skl2onnx.common.data_types import FloatTensorType
+
+ARTIFACTS_DIR = Path(__file__).resolve().parents[1] / "artifacts" / "model"
+
+MODEL_PATH = ARTIFACTS_DIR / "gradient_boosting_model.joblib"
+ONNX_MODEL_PATH = ARTIFACTS_DIR / "gradient_boosting_model.onnx"
+FEATURE_SCHEMA_PATH = ARTIFACTS_DIR / "feature_schema.json"
+
+ONNX_INPUT_NAME = "input"
+
+
+def export_onnx() -> Path:
+    model = joblib.load(MODEL_PATH)
+
+    with open(FEATURE_SCHEMA_PATH, "r") as f:
+        num_features = json.load(f)["num_features"]
+
+    onnx_model = to_onnx(
+        model,
+        initial_types=[(ONNX_INPUT_NAME, FloatTensorType([None, num_features]))],
+        # Plain probability tensor instead of a list of {class: prob} maps
+        options={id(model): {"zipmap": False}},
+        target_opset={"": 17, "ai.onnx.ml": 3},
+    )
+
+    with open(ONNX_MODEL_PATH, "wb") as f:
+        f.write(onnx_model.SerializeToString())
+
+    return ONNX_MODEL_PATH
+
+
+if __name__ == "__main__":
+    print(f"Exported ONNX model to {export_onnx()}")